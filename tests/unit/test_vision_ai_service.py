@@ -0,0 +1,119 @@
+"""Unit test cases for the box geometry in the vision ai service."""
+
+import numpy as np
+import pytest
+
+from video_service.services.vision_ai_service import (
+    DETECTION_BOX_MAXIMUM_SIZE,
+    DETECTION_BOX_MINIMUM_SIZE,
+    EDGE_MARGIN,
+    TriggerLine,
+    VisionAIService,
+)
+
+TRIGGER_LINE_XYXYN = [0.2, 0.5, 0.8, 0.6]
+
+# x1, y1, x2, y2 - box centre x is 0.5 unless noted, line y there is 0.55
+BOXES = [
+    [0.4, 0.3, 0.6, 0.6],  # below the line - 100
+    [0.4, 0.3, 0.6, 0.52],  # 90 band
+    [0.4, 0.3, 0.6, 0.47],  # 80 band
+    [0.4, 0.2, 0.6, 0.4],  # above all bands
+    [0.15, 0.3, 0.25, 0.7],  # centre at x1
+    [0.75, 0.3, 0.85, 0.7],  # centre at x2
+    [0.05, 0.3, 0.15, 0.9],  # left of x1
+    [0.85, 0.3, 0.95, 0.9],  # right of x2
+    [0.01, 0.3, 0.2, 0.6],  # at the left edge
+    [0.4, 0.01, 0.6, 0.6],  # at the top edge
+    [0.4, 0.3, 0.6, 0.99],  # at the bottom edge
+    [0.9, 0.3, 0.99, 0.6],  # at the right edge
+    [0.4, 0.3, 0.405, 0.6],  # too narrow
+    [0.4, 0.3, 0.6, 0.305],  # too low
+    [0.03, 0.03, 0.97, 0.6],  # too wide
+]
+
+
+def validate_box_scalar(xyxyn: list) -> float:
+    """Box validation as computed per box before vectorization."""
+    box_with = xyxyn[2] - xyxyn[0]
+    box_heigth = xyxyn[3] - xyxyn[1]
+    if (box_with < DETECTION_BOX_MINIMUM_SIZE) or (box_heigth < DETECTION_BOX_MINIMUM_SIZE):
+        return 0.0
+    if (box_with > DETECTION_BOX_MAXIMUM_SIZE) or (box_heigth > DETECTION_BOX_MAXIMUM_SIZE):
+        return 0.0
+    if (xyxyn[0] < EDGE_MARGIN) or (xyxyn[1] < EDGE_MARGIN):
+        return 0.75
+    if (xyxyn[2] > (1 - EDGE_MARGIN)) or (xyxyn[3] > (1 - EDGE_MARGIN)):
+        return 0.75
+    return 1.0
+
+
+def is_below_line_scalar(xyxyn: list, trigger_line: list) -> str:
+    """Line crossing as computed per box before vectorization."""
+    x_center_pos = (xyxyn[2] + xyxyn[0]) / 2
+    y_lower_pos = xyxyn[3]
+    x1, y1, x2, y2 = trigger_line
+    if (x_center_pos < x1) or (x_center_pos > x2):
+        return "false"
+    a = (y2 - y1) / (x2 - x1)
+    y = a * (x_center_pos - x1) + y1
+    y_80 = a * (x_center_pos - x1) + (y1 * 0.8)
+    y_90 = a * (x_center_pos - x1) + (y1 * 0.9)
+    if y_lower_pos > y:
+        return "100"
+    if y_lower_pos > y_90:
+        return "90"
+    if y_lower_pos > y_80:
+        return "80"
+    return "false"
+
+
+def random_boxes(count: int) -> list:
+    """Random normalized boxes, x1 < x2 and y1 < y2."""
+    rng = np.random.default_rng(2024)
+    xs = np.sort(rng.uniform(0, 1, (count, 2)), axis=1)
+    ys = np.sort(rng.uniform(0, 1, (count, 2)), axis=1)
+    return np.column_stack([xs[:, 0], ys[:, 0], xs[:, 1], ys[:, 1]]).tolist()
+
+
+@pytest.mark.unit
+def test_is_below_line_bands() -> None:
+    """Should classify boxes into the 100, 90 and 80 bands."""
+    crossed = VisionAIService().is_below_line(
+        np.array(BOXES[:8]), TriggerLine.from_xyxy(TRIGGER_LINE_XYXYN)
+    )
+    assert crossed.tolist() == ["100", "90", "80", "false", "100", "100", "false", "false"]
+
+
+@pytest.mark.unit
+def test_trigger_line_rejects_vertical_line() -> None:
+    """Should not create a trigger line with equal x1 and x2."""
+    with pytest.raises(Exception, match="vertical line"):
+        TriggerLine.from_xyxy([0.5, 0.2, 0.5, 0.8])
+
+
+@pytest.mark.unit
+def test_validate_box_edges_and_sizes() -> None:
+    """Should lower the score at the edges and reject too small or big boxes."""
+    box_confidences = VisionAIService().validate_box(np.array(BOXES[8:]))
+    assert box_confidences.tolist() == [0.75, 0.75, 0.75, 0.75, 0.0, 0.0, 0.0]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("boxes", [BOXES, random_boxes(500)])
+def test_is_below_line_matches_scalar(boxes: list) -> None:
+    """Should give the same result as the per box calculation."""
+    crossed = VisionAIService().is_below_line(
+        np.array(boxes), TriggerLine.from_xyxy(TRIGGER_LINE_XYXYN)
+    )
+    expected = [is_below_line_scalar(box, TRIGGER_LINE_XYXYN) for box in boxes]
+    assert crossed.tolist() == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("boxes", [BOXES, random_boxes(500)])
+def test_validate_box_matches_scalar(boxes: list) -> None:
+    """Should give the same result as the per box calculation."""
+    box_confidences = VisionAIService().validate_box(np.array(boxes))
+    expected = [validate_box_scalar(box) for box in boxes]
+    assert box_confidences.tolist() == expected
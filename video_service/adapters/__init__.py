@@ -2,10 +2,11 @@
 
 from .config_adapter import ConfigAdapter
 from .events_adapter import EventsAdapter
-from .exceptions import VideoStreamNotFoundError
+from .exceptions import UnauthorizedError, VideoStreamNotFoundError
 from .gcs_lock_adapter import GCSLockAdapter
 from .google_cloud_storage_adapter import GoogleCloudStorageAdapter
+from .http_session import HttpSession
 from .photos_file_adapter import PhotosFileAdapter
 from .service_instance_adapter import ServiceInstanceAdapter
-from .status_adapter import StatusAdapter
+from .status_adapter import StatusAdapter, StatusWriter
 from .user_adapter import UserAdapter
@@ -1,23 +1,32 @@
 """Module for config adapter."""
 
 import ast
+import asyncio
 import copy
 import json
 import logging
 import os
+import time
 from http import HTTPStatus
 from pathlib import Path
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs, web
 from dotenv import load_dotenv
 from multidict import MultiDict
 
+from .exceptions import UnauthorizedError
+from .http_session import HttpSession
+
 # get base settings
 load_dotenv()
 PHOTOS_HOST_SERVER = os.getenv("PHOTOS_HOST_SERVER", "localhost")
 PHOTOS_HOST_PORT = os.getenv("PHOTOS_HOST_PORT", "8092")
 PHOTO_SERVICE_URL = f"http://{PHOTOS_HOST_SERVER}:{PHOTOS_HOST_PORT}"
 PROJECT_ROOT = f"{Path.cwd()}/video_service"
+CONFIG_CACHE_TTL = 60  # seconds
+
+# in-process cache of config values: (event_id, key) -> (timestamp, value)
+_config_cache: dict[tuple[str, str], tuple[float, str]] = {}
 
 
 class ConfigAdapter:
@@ -34,7 +43,7 @@ class ConfigAdapter:
         )
         servicename = "get_config"
 
-        async with ClientSession() as session, session.get(
+        async with HttpSession.get() as session, session.get(
             f"{PHOTO_SERVICE_URL}/config?key={key}&eventId={event_id}",
             headers=headers,
         ) as resp:
@@ -42,7 +51,7 @@ class ConfigAdapter:
                 config = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             elif resp.status == HTTPStatus.NOT_FOUND:
                 # config not found - find default value
                 config_file = Path(f"{PROJECT_ROOT}/config/global_settings.json")
@@ -68,6 +77,17 @@ class ConfigAdapter:
                 raise web.HTTPBadRequest(reason=informasjon)
         return config["value"].strip()
 
+    async def get_config_cached(
+        self, token: str, event_id: str, key: str, ttl: float = CONFIG_CACHE_TTL
+    ) -> str:
+        """Get config by key, served from memory if read less than ttl seconds ago."""
+        cached = _config_cache.get((event_id, key))
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        value = await self.get_config(token, event_id, key)
+        _config_cache[(event_id, key)] = (time.monotonic(), value)
+        return value
+
     async def get_all_configs(self, token: str, event_id: str) -> list:
         """Get config by google id function."""
         config = []
@@ -83,7 +103,7 @@ class ConfigAdapter:
         else:
             url = f"{PHOTO_SERVICE_URL}/configs"
 
-        async with ClientSession() as session, session.get(
+        async with HttpSession.get() as session, session.get(
             url,
             headers=headers,
         ) as resp:
@@ -91,7 +111,7 @@ class ConfigAdapter:
                 config = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
@@ -99,14 +119,44 @@ class ConfigAdapter:
                 raise web.HTTPBadRequest(reason=informasjon)
         return config
 
+    async def get_configs(
+        self, token: str, event_id: str, keys: list[str], ttl: float = 0
+    ) -> dict[str, str]:
+        """Get several config values in one request, returned by key.
+
+        Values are also stored in the config cache. If ttl is given and all
+        keys were read less than ttl seconds ago, no request is made.
+        """
+        now = time.monotonic()
+        cached = {key: _config_cache.get((event_id, key)) for key in keys}
+        if ttl and all(c and now - c[0] < ttl for c in cached.values()):
+            return {key: c[1] for key, c in cached.items() if c}
+
+        all_configs = await self.get_all_configs(token, event_id)
+        configs = {
+            config["key"]: config["value"].strip()
+            for config in all_configs
+            if config["key"] in keys
+        }
+        # keys not in db - get_config will create them from default values
+        for key in keys:
+            if key not in configs:
+                configs[key] = await self.get_config(token, event_id, key)
+
+        now = time.monotonic()
+        for key, value in configs.items():
+            _config_cache[(event_id, key)] = (now, value)
+        return configs
+
     async def get_config_bool(self, token: str, event_id: str, key: str) -> bool:
         """Get config boolean value."""
         string_value = await self.get_config(token, event_id, key)
-        boolean_value = False
-        if string_value in ["True", "true", "1"]:
-            boolean_value = True
+        return self.to_bool(string_value)
 
-        return boolean_value
+    @staticmethod
+    def to_bool(string_value: str) -> bool:
+        """Convert config string value to boolean."""
+        return string_value in ["True", "true", "1"]
 
     async def get_config_int(self, token: str, event_id: str, key: str) -> int:
         """Get config int value."""
@@ -133,14 +183,17 @@ class ConfigAdapter:
     ) -> tuple:
         """Get config tuple value."""
         string_value = await self.get_config(token, event_id, key)
+        return self.to_img_res_tuple(key, string_value)
+
+    @staticmethod
+    def to_img_res_tuple(key: str, string_value: str) -> tuple:
+        """Convert config string value (e.g. 480x640) to tuple."""
         try:
             tuple_value = tuple(map(int, string_value.split("x")))
         except ValueError:
             informasjon = f"Error - {key} is not a tuple."
             raise Exception(informasjon) from None
         return tuple_value
-        # convert from json string to list
-        return json.loads(string_value)
 
     async def create_config(
         self, token: str, event_id: str, key: str, value: str
@@ -161,7 +214,7 @@ class ConfigAdapter:
         }
         request_body = copy.deepcopy(config)
 
-        async with ClientSession() as session, session.post(
+        async with HttpSession.get() as session, session.post(
             f"{PHOTO_SERVICE_URL}/config", headers=headers, json=request_body
         ) as resp:
             if resp.status == HTTPStatus.CREATED:
@@ -170,7 +223,7 @@ class ConfigAdapter:
                 result = location.split(os.path.sep)[-1]
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
@@ -186,12 +239,24 @@ class ConfigAdapter:
         new_value_str = json.dumps(new_value)
         return await self.update_config(token, event_id, key, new_value_str)
 
+    async def update_configs(
+        self, token: str, event_id: str, mapping: dict[str, str]
+    ) -> list[str]:
+        """Update several config values concurrently."""
+        return await asyncio.gather(
+            *(
+                self.update_config(token, event_id, key, value)
+                for key, value in mapping.items()
+            )
+        )
+
     async def update_config(
         self, token: str, event_id: str, key: str, new_value: str
     ) -> str:
         """Update config function."""
         response = ""
         servicename = "update_config"
+        _config_cache.pop((event_id, key), None)
         headers = MultiDict(
             [
                 (hdrs.CONTENT_TYPE, "application/json"),
@@ -204,7 +269,7 @@ class ConfigAdapter:
             "value": new_value,
         }
 
-        async with ClientSession() as session, session.put(
+        async with HttpSession.get() as session, session.put(
             f"{PHOTO_SERVICE_URL}/config", headers=headers, json=request_body
         ) as resp:
             response = str(resp.status)
@@ -225,7 +290,7 @@ class ConfigAdapter:
                 raise web.HTTPBadRequest(reason=informasjon)
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
@@ -6,10 +6,13 @@ import os
 from http import HTTPStatus
 from zoneinfo import ZoneInfo
 
-from aiohttp import ClientSession, hdrs
+from aiohttp import hdrs
 from dotenv import load_dotenv
 from multidict import MultiDict
 
+from .exceptions import UnauthorizedError
+from .http_session import HttpSession
+
 # get base settings
 load_dotenv()
 EVENTS_HOST_SERVER = os.getenv("EVENTS_HOST_SERVER", "localhost")
@@ -30,7 +33,7 @@ class EventsAdapter:
             ]
         )
 
-        async with ClientSession() as session, session.get(
+        async with HttpSession.get() as session, session.get(
                 f"{EVENT_SERVICE_URL}/events", headers=headers
             ) as resp:
                 logging.debug(f"get_all_events - got response {resp.status}")
@@ -39,7 +42,7 @@ class EventsAdapter:
                     logging.debug(f"events - got response {events}")
                 elif resp.status == HTTPStatus.UNAUTHORIZED:
                     informasjon = f"Login expired: {resp}"
-                    raise Exception(informasjon)
+                    raise UnauthorizedError(informasjon)
                 else:
                     informasjon = f"Error {resp.status} getting events: {resp} "
                     logging.error(informasjon)
@@ -52,14 +55,10 @@ class EventsAdapter:
 
     def get_local_time(self, event: dict, time_format: str) -> str:
         """Return local time string, time zone adjusted from event info."""
-        local_time = ""
-        time_zone = event["timezone"]
-        time_now = datetime.datetime.now(ZoneInfo(time_zone)) if time_zone else datetime.datetime.now(datetime.UTC)
+        time_now = self.get_local_datetime_now(event)
 
         if time_format == "HH:MM":
-            local_time = f"{time_now.strftime('%H')}:{time_now.strftime('%M')}"
-        elif time_format == "log":
-            local_time = f"{time_now.strftime('%Y')}-{time_now.strftime('%m')}-{time_now.strftime('%d')}T{time_now.strftime('%X')}"
-        else:
-            local_time = time_now.strftime("%X")
-        return local_time
+            return time_now.strftime("%H:%M")
+        if time_format == "log":
+            return time_now.strftime("%Y-%m-%dT%X")
+        return time_now.strftime("%X")
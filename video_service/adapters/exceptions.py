@@ -8,3 +8,11 @@ class VideoStreamNotFoundError(Exception):
         """Initialize the error."""
         # Call the base class constructor with the parameters it needs
         super().__init__(message)
+
+
+class UnauthorizedError(Exception):
+    """Class representing an expired or invalid login (401)."""
+
+    def __init__(self, message: str) -> None:
+        """Initialize the error."""
+        super().__init__(message)
@@ -8,6 +8,8 @@ from dotenv import load_dotenv
 from google.api_core import exceptions
 from google.cloud import storage
 
+from .google_cloud_storage_adapter import GoogleCloudStorageAdapter
+
 load_dotenv()
 GOOGLE_STORAGE_BUCKET = os.getenv("GOOGLE_STORAGE_BUCKET")
 GOOGLE_STORAGE_SERVER = os.getenv("GOOGLE_STORAGE_SERVER")
@@ -23,10 +25,10 @@ class GCSLockAdapter:
     LOCK_FILE_MIN_LINES = 2  # Lock file format: line 1=instance_id, line 2=timestamp
 
     def __init__(self) -> None:
-        """Initialize GCS client and bucket."""
-        self.storage_client = storage.Client()
+        """Initialize GCS client and bucket - the client is shared."""
+        self.bucket = GoogleCloudStorageAdapter.get_bucket()
+        self.storage_client = self.bucket.client
         self.bucket_name = GOOGLE_STORAGE_BUCKET
-        self.bucket = self.storage_client.bucket(self.bucket_name)
 
     def try_acquire_lock(self, file_path: str, instance_id: str) -> bool:
         """Try to acquire lock using GCS conditional upload.
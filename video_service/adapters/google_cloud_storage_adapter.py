@@ -2,7 +2,9 @@
 
 import logging
 import os
+import threading
 from pathlib import Path
+from typing import ClassVar
 
 from dotenv import load_dotenv
 from google.api_core.exceptions import Forbidden, NotFound
@@ -20,6 +22,18 @@ class GoogleCloudStorageAdapter:
 
     """Class representing google cloud storage."""
 
+    # one client for the process - creating a client resolves credentials and opens a new http session
+    _bucket: ClassVar[storage.Bucket | None] = None
+    _bucket_lock = threading.Lock()
+
+    @classmethod
+    def get_bucket(cls) -> storage.Bucket:
+        """Get the storage bucket, the client is created on first use."""
+        with cls._bucket_lock:
+            if cls._bucket is None:
+                cls._bucket = storage.Client().bucket(GOOGLE_STORAGE_BUCKET)
+            return cls._bucket
+
     def upload_blob(
             self,
             event_id: str,
@@ -30,8 +44,7 @@ class GoogleCloudStorageAdapter:
         servicename = "GoogleCloudStorageAdapter.upload_blob"
 
         try:
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(GOOGLE_STORAGE_BUCKET)
+            bucket = self.get_bucket()
             destination_blob_name = f"{Path(source_file_name).name}"
             if destination_folder != "":
                 destination_blob_name = (
@@ -58,8 +71,7 @@ class GoogleCloudStorageAdapter:
         """Upload a byte object to the bucket, return URL to uploaded file."""
         servicename = "GoogleCloudStorageAdapter.upload_blob_bytes"
 
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GOOGLE_STORAGE_BUCKET)
+        bucket = self.get_bucket()
 
         try:
             destination_blob_name = (
@@ -89,8 +101,7 @@ class GoogleCloudStorageAdapter:
         servicename = "GoogleCloudStorageAdapter.move_blob"
 
         try:
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(GOOGLE_STORAGE_BUCKET)
+            bucket = self.get_bucket()
             blob = bucket.blob(source_blob_name)
             new_blob = bucket.rename_blob(blob, destination_blob_name)
         except Exception as e:
@@ -127,8 +138,7 @@ class GoogleCloudStorageAdapter:
     def list_blobs(self, event_id: str, prefix: str) -> list[dict]:
         """List all blobs in the bucket that begin with the prefix."""
         servicename = "GoogleCloudStorageAdapter.list_blobs"
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GOOGLE_STORAGE_BUCKET)
+        bucket = self.get_bucket()
 
         try:
             blobs = list(bucket.list_blobs(prefix=f"{event_id}/{prefix}"))
@@ -154,8 +164,7 @@ class GoogleCloudStorageAdapter:
         """List all detected blobs in the bucket."""
         servicename = "GoogleCloudStorageAdapter.list_detect_blobs"
         detect_blobs = []
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GOOGLE_STORAGE_BUCKET)
+        bucket = self.get_bucket()
 
         try:
             all_detected_blobs = list(bucket.list_blobs(
@@ -197,8 +206,7 @@ class GoogleCloudStorageAdapter:
         servicename = "GoogleCloudStorageAdapter.delete_blob"
 
         try:
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(GOOGLE_STORAGE_BUCKET)
+            bucket = self.get_bucket()
             blob = bucket.blob(blob_name)
             blob.delete()
         except Exception as e:
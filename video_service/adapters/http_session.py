@@ -0,0 +1,42 @@
+"""Module for shared http client session."""
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from aiohttp import ClientSession, TCPConnector
+
+CONNECTION_LIMIT = 32
+KEEPALIVE_TIMEOUT = 75  # seconds
+
+
+class HttpSession:
+    """Class representing the http client session shared by all adapters."""
+
+    _session: ClientSession | None = None
+
+    @classmethod
+    async def open(cls) -> None:
+        """Open the shared session - call from within the running event loop."""
+        if cls._session is None or cls._session.closed:
+            cls._session = ClientSession(
+                connector=TCPConnector(
+                    limit=CONNECTION_LIMIT, keepalive_timeout=KEEPALIVE_TIMEOUT
+                )
+            )
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared session."""
+        if cls._session is not None:
+            await cls._session.close()
+            cls._session = None
+
+    @classmethod
+    @asynccontextmanager
+    async def get(cls) -> AsyncIterator[ClientSession]:
+        """Get the shared session, or a short-lived one if it is not open."""
+        if cls._session is not None and not cls._session.closed:
+            yield cls._session
+        else:
+            async with ClientSession() as session:
+                yield session
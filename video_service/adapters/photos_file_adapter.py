@@ -86,14 +86,14 @@ class PhotosFileAdapter:
         """Get first unlocked capture file from cloud storage."""
         try:
             file_list = GoogleCloudStorageAdapter().list_blobs(event_id, "CAPTURE/")
-            if file_list:
-                for capture_file in file_list:
-                    if not capture_file["name"].endswith(".lock"):
-                        for lock_file in file_list:
-                            if lock_file["name"] == f"{capture_file['name']}.lock":
-                                break
-                        else:
-                            return capture_file
+            # one pass over the listing - lock files are looked up in a set
+            lock_names = {f["name"] for f in file_list if f["name"].endswith(".lock")}
+            for capture_file in file_list:
+                if (
+                    not capture_file["name"].endswith(".lock")
+                    and f"{capture_file['name']}.lock" not in lock_names
+                ):
+                    return capture_file
         except Exception:
             informasjon = "Error getting captured files"
             logging.exception(informasjon)
@@ -1,25 +1,44 @@
 """Module for service instance adapter."""
 
+import json
 import logging
 import os
 from http import HTTPStatus
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs, web
 from multidict import MultiDict
 
 from .events_adapter import (
     EventsAdapter,
 )
+from .exceptions import UnauthorizedError
+from .http_session import HttpSession
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None  # type: ignore[assignment]
 
 PHOTOS_HOST_SERVER = os.getenv("PHOTOS_HOST_SERVER", "localhost")
 PHOTOS_HOST_PORT = os.getenv("PHOTOS_HOST_PORT", "8092")
 PHOTO_SERVICE_URL = f"http://{PHOTOS_HOST_SERVER}:{PHOTOS_HOST_PORT}"
 
 
+def _dump_json(data: dict) -> bytes:
+    """Serialize request body to JSON bytes, with orjson if installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
 class ServiceInstanceAdapter:
 
     """Class representing service instance."""
 
+    def __init__(self) -> None:
+        """Initialize the adapter."""
+        self._events = EventsAdapter()
+
     async def get_all_service_instances(
         self,
         token: str,
@@ -50,7 +69,7 @@ class ServiceInstanceAdapter:
         if query_params:
             url += "?" + "&".join(query_params)
 
-        async with ClientSession() as session, session.get(
+        async with HttpSession.get() as session, session.get(
             url,
             headers=headers,
         ) as resp:
@@ -58,7 +77,7 @@ class ServiceInstanceAdapter:
                 service_instances = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
@@ -81,7 +100,7 @@ class ServiceInstanceAdapter:
         )
         servicename = "get_service_instance_by_id"
 
-        async with ClientSession() as session, session.get(
+        async with HttpSession.get() as session, session.get(
             f"{PHOTO_SERVICE_URL}/service-instances/{service_instance_id}",
             headers=headers,
         ) as resp:
@@ -95,7 +114,7 @@ class ServiceInstanceAdapter:
                 raise web.HTTPNotFound(reason=informasjon)
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
@@ -118,10 +137,10 @@ class ServiceInstanceAdapter:
             ],
         )
 
-        async with ClientSession() as session, session.post(
+        async with HttpSession.get() as session, session.post(
             f"{PHOTO_SERVICE_URL}/service-instances",
             headers=headers,
-            json=service_instance,
+            data=_dump_json(service_instance),
         ) as resp:
             if resp.status == HTTPStatus.CREATED:
                 logging.debug(f"result - got response {resp}")
@@ -129,7 +148,7 @@ class ServiceInstanceAdapter:
                 result = location.split(os.path.sep)[-1]
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             elif resp.status == HTTPStatus.UNPROCESSABLE_ENTITY:
                 body = await resp.json()
                 informasjon = (
@@ -168,10 +187,11 @@ class ServiceInstanceAdapter:
             )
             action = action.replace("_all", "")
 
+        time_now = self._events.get_local_time(event, "log")
         for instance in service_instances:
             # Update the service instance
             instance["action"] = action
-            instance["last_updated"] = EventsAdapter().get_local_time(event, "log")
+            instance["last_updated"] = time_now
             informasjon = await self.update_service_instance(
                 token, instance["id"], instance,
             )
@@ -193,10 +213,11 @@ class ServiceInstanceAdapter:
             service_instances.append(
                 await self.get_service_instance_by_id(token, instance_id),
             )
+        time_now = self._events.get_local_time(event, "log")
         for instance in service_instances:
             # Update the service instance
             instance["status"] = status
-            instance["last_updated"] = EventsAdapter().get_local_time(event, "log")
+            instance["last_updated"] = time_now
             informasjon = await self.update_service_instance(
                 token, instance["id"], instance,
             )
@@ -212,11 +233,27 @@ class ServiceInstanceAdapter:
         """Update service instance function."""
         # Get the current service instance and update the last_heartbeat field
         instance = await self.get_service_instance_by_id(token, instance_id)
-        instance["last_heartbeat"] = EventsAdapter().get_local_time(event, "log")
+        instance["last_heartbeat"] = self._events.get_local_time(event, "log")
 
         # Update the service instance
         return await self.update_service_instance(token, instance_id, instance)
 
+    async def heartbeat_and_set_status(
+        self,
+        token: str,
+        event: dict,
+        instance_id: str,
+        status: str,
+    ) -> str:
+        """Update service instance last_heartbeat and status in one update."""
+        instance = await self.get_service_instance_by_id(token, instance_id)
+        time_now = self._events.get_local_time(event, "log")
+        instance["last_heartbeat"] = time_now
+        instance["last_updated"] = time_now
+        instance["status"] = status
+
+        return await self.update_service_instance(token, instance_id, instance)
+
     async def update_service_instance(
         self,
         token: str,
@@ -233,10 +270,10 @@ class ServiceInstanceAdapter:
             ],
         )
 
-        async with ClientSession() as session, session.put(
+        async with HttpSession.get() as session, session.put(
             f"{PHOTO_SERVICE_URL}/service-instances/{service_instance_id}",
             headers=headers,
-            json=service_instance,
+            data=_dump_json(service_instance),
         ) as resp:
             response = str(resp.status)
             if resp.status == HTTPStatus.NO_CONTENT:
@@ -249,7 +286,7 @@ class ServiceInstanceAdapter:
                 raise web.HTTPNotFound(reason=informasjon)
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             elif resp.status == HTTPStatus.UNPROCESSABLE_ENTITY:
                 body = await resp.json()
                 informasjon = (
@@ -279,7 +316,7 @@ class ServiceInstanceAdapter:
             ],
         )
 
-        async with ClientSession() as session, session.delete(
+        async with HttpSession.get() as session, session.delete(
             f"{PHOTO_SERVICE_URL}/service-instances/{service_instance_id}",
             headers=headers,
         ) as resp:
@@ -294,7 +331,7 @@ class ServiceInstanceAdapter:
                 raise web.HTTPNotFound(reason=informasjon)
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
@@ -1,27 +1,37 @@
 """Module for status adapter."""
 
+import asyncio
 import copy
 import logging
 import os
+from collections.abc import Callable
 from http import HTTPStatus
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs, web
 from dotenv import load_dotenv
 from multidict import MultiDict
 
 from .events_adapter import EventsAdapter
+from .exceptions import UnauthorizedError
+from .http_session import HttpSession
 
 # get base settings
 load_dotenv()
 PHOTOS_HOST_SERVER = os.getenv("PHOTOS_HOST_SERVER", "localhost")
 PHOTOS_HOST_PORT = os.getenv("PHOTOS_HOST_PORT", "8092")
 PHOTO_SERVICE_URL = f"http://{PHOTOS_HOST_SERVER}:{PHOTOS_HOST_PORT}"
+UNAUTHORIZED_RETRIES = 6  # retries of a status message written with an expired token
+UNAUTHORIZED_RETRY_DELAY = 10  # seconds - time for the service loop to log in again
 
 
 class StatusAdapter:
 
     """Class representing status."""
 
+    def __init__(self) -> None:
+        """Initialize the adapter."""
+        self._events = EventsAdapter()
+
     async def get_status(self, token: str, event_id: str, count: int) -> list:
         """Get latest status messages."""
         status = []
@@ -33,7 +43,7 @@ class StatusAdapter:
         )
         servicename = "get_status"
 
-        async with ClientSession() as session, session.get(
+        async with HttpSession.get() as session, session.get(
             f"{PHOTO_SERVICE_URL}/status?count={count}&eventId={event_id}",
             headers=headers,
         ) as resp:
@@ -41,7 +51,7 @@ class StatusAdapter:
                 status = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
@@ -62,7 +72,7 @@ class StatusAdapter:
         )
         servicename = "get_status"
 
-        async with ClientSession() as session, session.get(
+        async with HttpSession.get() as session, session.get(
             f"{PHOTO_SERVICE_URL}/status?count={count}&eventId={event['id']}&type={status_type}",
             headers=headers,
         ) as resp:
@@ -70,7 +80,7 @@ class StatusAdapter:
                 status = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
@@ -79,11 +89,18 @@ class StatusAdapter:
         return status
 
     async def create_status(
-        self, token: str, event: dict, status_type: str, message: str, details: dict
+        self,
+        token: str,
+        event: dict,
+        status_type: str,
+        message: str,
+        details: dict,
+        *,
+        log_time: str = "",
     ) -> str:
-        """Create new status function."""
+        """Create new status function - log_time defaults to now."""
         servicename = "create_status"
-        time = EventsAdapter().get_local_time(event, "log")
+        time = log_time or self._events.get_local_time(event, "log")
         headers = MultiDict(
             [
                 (hdrs.CONTENT_TYPE, "application/json"),
@@ -100,7 +117,7 @@ class StatusAdapter:
         }
         request_body = copy.deepcopy(status_dict)
 
-        async with ClientSession() as session, session.post(
+        async with HttpSession.get() as session, session.post(
             f"{PHOTO_SERVICE_URL}/status", headers=headers, json=request_body
         ) as resp:
             if resp.status == HTTPStatus.CREATED:
@@ -108,8 +125,8 @@ class StatusAdapter:
                 location = resp.headers[hdrs.LOCATION]
                 result = location.split(os.path.sep)[-1]
             elif resp.status == HTTPStatus.UNAUTHORIZED:
-                err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                informasjon = f"Login expired: {resp}"
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
@@ -129,14 +146,14 @@ class StatusAdapter:
             ]
         )
         url = f"{PHOTO_SERVICE_URL}/status?eventId={event['id']}"
-        async with ClientSession() as session, session.delete(
+        async with HttpSession.get() as session, session.delete(
             url, headers=headers,
         ) as resp:
             if resp.status == HTTPStatus.NO_CONTENT:
                 logging.debug(f"result - got response {resp}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
-                err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                informasjon = f"Login expired: {resp}"
+                raise UnauthorizedError(informasjon)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
@@ -144,3 +161,64 @@ class StatusAdapter:
                     reason=f"Error - {resp.status}: {body['detail']}.",
                 )
         return resp.status
+
+
+class StatusWriter:
+    """Class writing status messages one by one in the background, off the caller's path."""
+
+    def __init__(self) -> None:
+        """Initialize the writer."""
+        self._queue: asyncio.Queue[tuple] = asyncio.Queue()
+        self._events = EventsAdapter()
+        self._status = StatusAdapter()
+
+    def enqueue(
+        self,
+        token_provider: Callable[[], str],
+        event: dict,
+        status_type: str,
+        message: str,
+        details: dict,
+    ) -> None:
+        """Queue a status message for writing, without waiting for it.
+
+        The token is read from token_provider when the message is written, so
+        messages queued before a new login are written with the new token.
+        """
+        # timestamp when the message is queued, not when it is written
+        log_time = self._events.get_local_time(event, "log") if event else ""
+        self._queue.put_nowait((token_provider, event, status_type, message, details, log_time))
+
+    async def run(self) -> None:
+        """Write queued status messages until cancelled, then flush the rest."""
+        try:
+            while True:
+                await self._write(await self._queue.get())
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
+
+    async def flush(self) -> None:
+        """Write all queued status messages."""
+        while not self._queue.empty():
+            await self._write(self._queue.get_nowait())
+
+    async def _write(self, status: tuple) -> None:
+        """Write one status message - one at a time, so they are stored in order."""
+        token_provider, event, status_type, message, details, log_time = status
+        for attempt in range(UNAUTHORIZED_RETRIES + 1):
+            try:
+                await self._status.create_status(
+                    token_provider(), event, status_type, message, details, log_time=log_time
+                )
+            except UnauthorizedError:
+                if attempt == UNAUTHORIZED_RETRIES:
+                    logging.exception("create_status failed - login expired")
+                    return
+                # token expired - wait for a new login before trying again
+                await asyncio.sleep(UNAUTHORIZED_RETRY_DELAY)
+            except Exception:
+                logging.exception("create_status failed")
+                return
+            else:
+                return
@@ -4,10 +4,12 @@ import logging
 import os
 from http import HTTPStatus
 
-from aiohttp import ClientSession, hdrs
+from aiohttp import hdrs
 from dotenv import load_dotenv
 from multidict import MultiDict
 
+from .http_session import HttpSession
+
 # get base settings
 load_dotenv()
 USERS_HOST_SERVER = os.getenv("USERS_HOST_SERVER")
@@ -30,7 +32,7 @@ class UserAdapter:
                 (hdrs.CONTENT_TYPE, "application/json"),
             ]
         )
-        async with ClientSession() as session, session.post(
+        async with HttpSession.get() as session, session.post(
             f"{USER_SERVICE_URL}/login", headers=headers, json=request_body
         ) as resp:
             result = resp.status
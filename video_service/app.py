@@ -1,10 +1,13 @@
 """Module for application looking at video and detecting line crossings."""
 
 import asyncio
+import contextlib
 import logging
 import os
+import random
 import socket
-from http import HTTPStatus
+import time
+from dataclasses import dataclass, field
 from logging.handlers import RotatingFileHandler
 
 from dotenv import load_dotenv
@@ -12,33 +15,68 @@ from dotenv import load_dotenv
 from video_service.adapters import (
     ConfigAdapter,
     EventsAdapter,
+    HttpSession,
     ServiceInstanceAdapter,
-    StatusAdapter,
+    StatusWriter,
+    UnauthorizedError,
     UserAdapter,
 )
 from video_service.services import VideoService, VisionAIService
 
+try:
+    import uvloop
+except ImportError:  # optional speedup, see the "speedups" extra
+    uvloop = None  # type: ignore[assignment]
+
 # get base settings
 load_dotenv()
 CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
-event = {"id": ""}
-status_type = ""
-STATUS_INTERVAL = 60
+STATUS_INTERVAL = 300  # seconds between heartbeats
+VALID_MODES = ["CAPTURE_LOCAL", "DETECT"]
+MIN_RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 60
+POLL_INTERVAL = 5.0
+MAX_POLL_INTERVAL = 30.0
+POLL_BACKOFF = 1.5
+SHUTDOWN_TIMEOUT = 5
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "a")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", ".")
+EVENT_ID = os.getenv("EVENT_ID")
 
-# set up logging
 LOGGING_LEVEL = os.getenv("LOGGING_LEVEL", "INFO")
-logging.basicConfig(
-    level=LOGGING_LEVEL,
-    format="%(asctime)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
-# Separate logging for errors
-file_handler = RotatingFileHandler("error.log", maxBytes=1024 * 1024, backupCount=5)
-file_handler.setLevel(logging.ERROR)
-# Create a formatter with the desired format
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
-logging.getLogger().addHandler(file_handler)
+
+# adapters and services are stateless - share one instance of each for the process lifetime
+_config = ConfigAdapter()
+_status_writer = StatusWriter()
+_events = EventsAdapter()
+_service_instances = ServiceInstanceAdapter()
+_users = UserAdapter()
+_video_service = VideoService()
+_vision_ai_service = VisionAIService()
+
+HOST_NAME = socket.gethostname()
+
+# the event is resolved once per process - concurrent callers share one lookup
+_event_cache: dict = {}
+_event_lock = asyncio.Lock()
+
+
+@dataclass(slots=True)
+class VideoConfig:
+    """Actions requested for this service instance."""
+
+    video_start: bool = False
+    new_trigger_line_photo: bool = False
+
+
+@dataclass(slots=True)
+class ServiceContext:
+    """Login and event details shared by the service loop."""
+
+    token: str = ""
+    event: dict = field(default_factory=dict)
+    event_id: str = ""
+
 
 # Generate from hostname and PID
 service_info = {
@@ -46,169 +84,222 @@ service_info = {
     "name": "",
     "id": "",
     "status_type": "",
+    "status": "",  # last status written to the service instance
 }
 
 if os.getenv("K_REVISION"):
     service_info["name"] = str(os.getenv("K_REVISION"))
 else:
-    service_info["name"] = f"{socket.gethostname()}"
+    service_info["name"] = HOST_NAME
 
 
-async def create_service_instance_dict(
-    token: str,
+def configure_logging() -> None:
+    """Set up logging - safe to call more than once."""
+    logging.basicConfig(
+        level=LOGGING_LEVEL,
+        format="%(asctime)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    # Separate logging for errors - only attach the file handler once
+    if any(
+        isinstance(h, RotatingFileHandler) for h in logging.getLogger().handlers
+    ):
+        return
+    file_handler = RotatingFileHandler("error.log", maxBytes=1024 * 1024, backupCount=5)
+    file_handler.setLevel(logging.ERROR)
+    # Create a formatter with the desired format
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    file_handler.setFormatter(formatter)
+    logging.getLogger().addHandler(file_handler)
+
+
+def create_service_instance_dict(
     event: dict,
+    trigger_line_xyxyn: str,
 ) -> dict:
     """Create a service instance dictionary.
 
     Args:
-        token: Authentication token for database access
         event: The event dictionary
+        trigger_line_xyxyn: Trigger line coordinates from config
 
     Returns:
         A dictionary representing the service instance
 
     """
-    time_now = EventsAdapter().get_local_time(event, "log")
+    time_now = _events.get_local_time(event, "log")
     return {
         "service_type": f"VIDEO_SERVICE_{service_info['mode']}",
         "instance_name": service_info["name"],
         "status": "ready",
-        "host_name": socket.gethostname(),
+        "host_name": HOST_NAME,
         "action": "",
         "event_id": event["id"],
         "started_at": time_now,
         "last_heartbeat": time_now,
         "metadata": {
             "latest_photo_url": "",
-            "trigger_line_xyxyn": await ConfigAdapter().get_config(
-                token, event["id"], "TRIGGER_LINE_XYXYN"
-            ),
+            "trigger_line_xyxyn": trigger_line_xyxyn,
         }
     }
 
 
 async def main() -> None:
     """CLI for analysing video stream."""
-    token = ""
-    event = {}
+    configure_logging()
+    # validate mode before any login or db access
+    if service_info["mode"] not in VALID_MODES:
+        err_msg = f"Invalid mode {service_info['mode']} - exiting."
+        logging.error(err_msg)
+        raise Exception(err_msg)
+    ctx = ServiceContext()
+    # one pooled http session for all adapters, closed on exit
+    await HttpSession.open()
+    status_task = asyncio.create_task(_status_writer.run())
     try:
         try:
-            # login to data-source
-            token = await do_login()
-            event = await get_event(token)
-
-            if service_info["mode"] not in ["CAPTURE_LOCAL", "DETECT"]:
-                informasjon = f"Invalid mode {service_info['mode']} - exiting."
-                raise Exception(informasjon)
-
-            service_info["status_type"] += await ConfigAdapter().get_config(
-                token, event["id"], "VIDEO_SERVICE_STATUS_TYPE"
-            ) + f"_{service_info['mode']}"
-            information = (f"{service_info['name']}, mode {service_info['mode']} er klar.")
-            await StatusAdapter().create_status(
-                token, event, service_info["status_type"], information, event
-            )
-
-            service_instance = await create_service_instance_dict(token, event)
-            service_info["id"] = await ServiceInstanceAdapter().create_service_instance(token, service_instance)
+            await start_service(ctx)
 
-            i = 0
+            last_heartbeat = time.monotonic()
+            poll_interval = POLL_INTERVAL
             while True:
                 try:
-                    if i > STATUS_INTERVAL:
-                        await ServiceInstanceAdapter().send_heartbeat(token, event, service_info["id"])
-                        i = 0
+                    # back off while idle, reset as soon as there is work to do
+                    if await run_the_video_service(ctx, service_info):
+                        poll_interval = POLL_INTERVAL
                     else:
-                        i += 1
-                    await run_the_video_service(token, event, service_info)
+                        poll_interval = min(poll_interval * POLL_BACKOFF, MAX_POLL_INTERVAL)
                     # service ready!
-                    await ServiceInstanceAdapter().update_service_instance_status(token, event, service_info["id"], "ready")
-                except Exception as e:
-                    err_string = str(e)
-                    logging.exception(err_string)
-                    # try new login if token expired (401 error)
-                    if str(HTTPStatus.UNAUTHORIZED.value) in err_string:
-                        token = await do_login()
-                    else:
-                        raise Exception(err_string) from e
-                await asyncio.sleep(5)
+                    if time.monotonic() - last_heartbeat > STATUS_INTERVAL:
+                        await _service_instances.heartbeat_and_set_status(ctx.token, ctx.event, service_info["id"], "ready")
+                        last_heartbeat = time.monotonic()
+                        service_info["status"] = "ready"
+                    elif service_info["status"] != "ready":
+                        # only write the status when it has changed
+                        await _service_instances.update_service_instance_status(ctx.token, ctx.event, service_info["id"], "ready")
+                        service_info["status"] = "ready"
+                except UnauthorizedError:
+                    # token expired - try new login
+                    logging.info("Login expired - logging in again.")
+                    ctx.token = await do_login()
+                await asyncio.sleep(poll_interval)
 
         except Exception as e:
             err_string = str(e)
             logging.exception(err_string)
-            await StatusAdapter().create_status(
-                token, event, service_info["status_type"], "Critical Error - exiting program", {"error": err_string}
+            _status_writer.enqueue(
+                lambda: ctx.token, ctx.event, service_info["status_type"], "Critical Error - exiting program", {"error": err_string}
             )
-            if service_info["id"]:
-                await ServiceInstanceAdapter().delete_service_instance(
-                    token, service_info["id"]
-                )
     except asyncio.CancelledError:
-        await StatusAdapter().create_status(
-            token,
-            event,
+        _status_writer.enqueue(
+            lambda: ctx.token,
+            ctx.event,
             service_info["status_type"],
             f"{service_info['name']} was cancelled (ctrl-c pressed).",
             {}
         )
-    if service_info["id"]:
-        await ServiceInstanceAdapter().delete_service_instance(token, service_info["id"])
+    finally:
+        # bounded cleanup - do not hang on shutdown if backend is unresponsive
+        if service_info["id"]:
+            with contextlib.suppress(Exception):
+                await asyncio.wait_for(
+                    _service_instances.delete_service_instance(ctx.token, service_info["id"]),
+                    timeout=SHUTDOWN_TIMEOUT,
+                )
+            service_info["id"] = ""
+        # stop the status writer - it flushes queued messages before exit
+        status_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await asyncio.wait_for(status_task, timeout=SHUTDOWN_TIMEOUT)
+        await HttpSession.close()
     logging.info("Goodbye!")
 
 
-async def run_the_video_service(token: str, event: dict, service_info: dict) -> None:
-    """Run the service."""
-    video_config = {}
-    video_config = await get_config(token, service_info["id"])
-    storage_mode = await ConfigAdapter().get_config(
-        token, event["id"], "VIDEO_STORAGE_MODE"
+async def start_service(ctx: ServiceContext) -> None:
+    """Login, find the event and register this service instance."""
+    # login to data-source
+    ctx.token = await do_login()
+    ctx.event = await get_event(ctx.token)
+    ctx.event_id = ctx.event["id"]
+
+    status_type, trigger_line_xyxyn = await asyncio.gather(
+        _config.get_config(ctx.token, ctx.event_id, "VIDEO_SERVICE_STATUS_TYPE"),
+        _config.get_config_cached(
+            ctx.token, ctx.event_id, "TRIGGER_LINE_XYXYN", ttl=300
+        ),
+    )
+    service_info["status_type"] += f"{status_type}_{service_info['mode']}"
+    information = (f"{service_info['name']}, mode {service_info['mode']} er klar.")
+    _status_writer.enqueue(
+        lambda: ctx.token, ctx.event, service_info["status_type"], information, ctx.event
     )
 
+    service_instance = create_service_instance_dict(ctx.event, trigger_line_xyxyn)
+    service_info["id"] = await _service_instances.create_service_instance(ctx.token, service_instance)
+    service_info["status"] = service_instance["status"]
+
+
+async def run_the_video_service(ctx: ServiceContext, service_info: dict) -> bool:
+    """Run the service, return True if an action was handled."""
+    video_config = await get_config(ctx.token, service_info["id"])
+    if not (video_config.video_start or video_config.new_trigger_line_photo):
+        return False
+
     try:
-        if video_config["video_start"]:
-            await ServiceInstanceAdapter().update_service_instance_status(
-                token, event, service_info["id"], "running"
+        if video_config.video_start:
+            await _service_instances.update_service_instance_status(
+                ctx.token, ctx.event, service_info["id"], "running"
             )
+            service_info["status"] = "running"
             if service_info["mode"] == "CAPTURE_LOCAL":
-                await VisionAIService().print_photo_with_trigger_line(token, event, service_info["status_type"])
-                await VideoService().capture_video(token, event, service_info)
+                await _vision_ai_service.print_photo_with_trigger_line(ctx.token, ctx.event, service_info["status_type"])
+                await _video_service.capture_video(ctx.token, ctx.event, service_info)
             elif service_info["mode"] == "DETECT":
+                # only needed when there is work - idle ticks make no extra lookup
+                storage_mode = await _config.get_config_cached(
+                    ctx.token, ctx.event_id, "VIDEO_STORAGE_MODE"
+                )
                 if storage_mode == "local_storage":
-                    await VideoService().detect_crossings_local_storage(token, event, service_info["status_type"])
+                    await _video_service.detect_crossings_local_storage(ctx.token, ctx.event, service_info["status_type"])
                 else:
-                    await VideoService().detect_crossings_cloud_storage(
-                        token, event, service_info["name"], service_info["status_type"]
+                    await _video_service.detect_crossings_cloud_storage(
+                        ctx.token, ctx.event, service_info["name"], service_info["status_type"]
                     )
-        elif video_config["new_trigger_line_photo"]:
+        elif video_config.new_trigger_line_photo:
             # new trigger line photo - reset
-            await VisionAIService().print_photo_with_trigger_line(token, event, service_info["status_type"])
+            await _vision_ai_service.print_photo_with_trigger_line(ctx.token, ctx.event, service_info["status_type"])
 
     except Exception as e:
         err_string = str(e)
         logging.exception(err_string)
-        await StatusAdapter().create_status(
-            token,
-            event,
+        _status_writer.enqueue(
+            lambda: ctx.token,
+            ctx.event,
             service_info["status_type"],
             f"Error in {service_info['name']}.",
             {"error": err_string},
         )
-        await ServiceInstanceAdapter().update_service_instance_action(token, event, service_info["id"], "error")
+        try:
+            await _service_instances.update_service_instance_action(ctx.token, ctx.event, service_info["id"], "error")
+        except Exception:
+            logging.exception("Error setting service instance action to error.")
+    return True
 
 async def do_login() -> str:
     """Login to data-source."""
-    uid = os.getenv("ADMIN_USERNAME", "a")
-    pw = os.getenv("ADMIN_PASSWORD", ".")
+    delay = MIN_RETRY_DELAY
     while True:
         try:
-            token = await UserAdapter().login(uid, pw)
+            token = await _users.login(ADMIN_USERNAME, ADMIN_PASSWORD)
             if token:
                 return token
         except Exception as e:
             err_string = str(e)
             logging.info(err_string)
         logging.info("video-service is waiting for db connection")
-        await asyncio.sleep(5)
+        # exponential backoff with jitter - avoid synchronized retries across instances
+        await asyncio.sleep(delay + random.uniform(0, delay * 0.2))  # noqa: S311
+        delay = min(delay * 2, MAX_RETRY_DELAY)
 
 
 async def get_event(token: str) -> dict:
@@ -222,48 +313,42 @@ async def get_event(token: str) -> dict:
             information += f"\n *** {_event['name']}, {_event['date_of_event']} id: {_event['id']} "
         raise Exception(information)
 
-    event = {}
-    while True:
-        try:
-            events_db = await EventsAdapter().get_all_events(token)
-            event_id_config = os.getenv("EVENT_ID")
-            if len(events_db) == 1:
-                event = events_db[0]
-            elif len(events_db) > 1:
-                for _event in events_db:
-                    if _event["id"] == event_id_config:
-                        event = _event
-                        break
-                else:
-                    raise_multiple_events_error(events_db)
-            if event:
-                break
-        except Exception as e:
-            err_string = str(e)
-            logging.info(err_string)
-        logging.info("video-service is waiting for an event to work on.")
-        await asyncio.sleep(5)
-
-    return event
-
-
-async def get_config(token: str, instance_id: str) -> dict:
+    async with _event_lock:
+        if _event_cache:
+            return _event_cache
+        event = None
+        delay = MIN_RETRY_DELAY
+        while True:
+            try:
+                events_db = await _events.get_all_events(token)
+                if len(events_db) == 1:
+                    event = events_db[0]
+                elif len(events_db) > 1:
+                    event = next((e for e in events_db if e["id"] == EVENT_ID), None)
+                    if not event:
+                        raise_multiple_events_error(events_db)
+                if event:
+                    break
+            except Exception as e:
+                err_string = str(e)
+                logging.info(err_string)
+            logging.info("video-service is waiting for an event to work on.")
+            await asyncio.sleep(delay + random.uniform(0, delay * 0.2))  # noqa: S311
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+
+        _event_cache.update(event)
+        return _event_cache
+
+
+async def get_config(token: str, instance_id: str) -> VideoConfig:
     """Get config details - use info from db."""
-    instance_info = await ServiceInstanceAdapter().get_service_instance_by_id(token, instance_id)
-    instance_config = {
-        "video_start": False,
-        "new_trigger_line_photo": False,
-    }
-
-    if instance_info["action"] == "start":
-        instance_config["video_start"] = True
-    elif instance_info["action"] == "trigger_line_photo":
-        instance_config["new_trigger_line_photo"] = True
-    elif instance_info["action"] == "stop":
-        instance_config["video_start"] = False
-
-    return instance_config
-
+    instance_info = await _service_instances.get_service_instance_by_id(token, instance_id)
+    action = instance_info["action"]
+    return VideoConfig(
+        video_start=action == "start",
+        new_trigger_line_photo=action == "trigger_line_photo",
+    )
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    asyncio.run(main(), loop_factory=loop_factory)
@@ -1,14 +1,20 @@
 """Module for video services."""
 
+from __future__ import annotations
+
 import asyncio
 import datetime
+import functools
+import importlib.util
 import logging
 import os
+import queue
+import shutil
+import threading
 from pathlib import Path
+from typing import TYPE_CHECKING, ClassVar
 
 import cv2
-import numpy as np
-from ultralytics import YOLO
 
 from video_service.adapters import (
     ConfigAdapter,
@@ -20,14 +26,99 @@ from video_service.adapters import (
     VideoStreamNotFoundError,
 )
 from video_service.services.vision_ai_service import (
+    TriggerLine,
     VisionAIService,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    import numpy as np
+    from ultralytics import YOLO
+
 DETECTION_CLASSES = [0]  # person
+DETECTION_BATCH_SIZE = 16  # frames per inference call
+WRITER_CODECS = ["avc1", "mp4v"]  # preferred first
+# optional fast local folder (e.g. tmpfs /dev/shm) to encode clips in before they are moved
+CAPTURE_STAGING_PATH = os.getenv("CAPTURE_STAGING_PATH", "")
+CLIP_COMPRESSION_RATIO = 20  # raw frame bytes per encoded byte, low to keep room in staging
+WRITE_QUEUE_SECONDS = 2  # seconds of video buffered between reader and writer
 
 class VideoService:
     """Class representing video service."""
 
+    # loaded models by name - loading weights is slow, reuse them across clips
+    _yolo_models: ClassVar[dict[str, YOLO]] = {}
+    _yolo_lock = threading.Lock()
+    # exported TensorRT engines by (model name, image size) - the model name itself if export failed
+    _tensorrt_engines: ClassVar[dict[tuple[str, tuple], str]] = {}
+    _tensorrt_locks: ClassVar[dict[tuple[str, tuple], threading.Lock]] = {}
+    _writer_codec: ClassVar[str] = ""
+
+    @classmethod
+    def get_yolo_model(cls, model_name: str) -> YOLO:
+        """Get a YOLO model, loaded on first use."""
+        with cls._yolo_lock:
+            if model_name not in cls._yolo_models:
+                # ultralytics (and torch) is only needed in DETECT mode - import on first use
+                import ultralytics  # noqa: PLC0415
+
+                cls._yolo_models[model_name] = ultralytics.YOLO(model_name)
+            return cls._yolo_models[model_name]
+
+    @classmethod
+    def get_tensorrt_engine(cls, model_name: str, image_size: tuple) -> str:
+        """Get a TensorRT FP16 engine for the model, exported on first use and kept on disk."""
+        key = (model_name, image_size)
+        with cls._yolo_lock:
+            if key in cls._tensorrt_engines:
+                return cls._tensorrt_engines[key]
+            export_lock = cls._tensorrt_locks.setdefault(key, threading.Lock())
+        # export can take minutes - hold only the lock for this engine, not the model lock
+        with export_lock:
+            with cls._yolo_lock:
+                if key in cls._tensorrt_engines:
+                    return cls._tensorrt_engines[key]
+            engine_path = cls.export_tensorrt_engine(model_name, image_size)
+            with cls._yolo_lock:
+                cls._tensorrt_engines[key] = engine_path
+            return engine_path
+
+    @staticmethod
+    def export_tensorrt_engine(model_name: str, image_size: tuple) -> str:
+        """Export the model to a TensorRT engine, return the model name if export is not possible."""
+        size_text = "x".join(map(str, image_size))
+        engine_path = Path(model_name).with_name(f"{Path(model_name).stem}_{size_text}.engine")
+        if engine_path.exists():
+            return str(engine_path)
+        # check first - ultralytics would otherwise try to install tensorrt during export
+        if importlib.util.find_spec("tensorrt") is None:
+            logging.warning(f"TensorRT is not installed, using {model_name} as is.")
+            return model_name
+        try:
+            import ultralytics  # noqa: PLC0415
+
+            exported = ultralytics.YOLO(model_name).export(
+                format="engine",
+                imgsz=image_size,
+                half=True,
+                dynamic=True,
+                batch=DETECTION_BATCH_SIZE,
+            )
+            Path(exported).replace(engine_path)
+        except Exception:
+            logging.exception(f"TensorRT export failed for {model_name}, using the model as is.")
+            return model_name
+        return str(engine_path)
+
+    @staticmethod
+    @functools.cache
+    def use_half_precision() -> bool:
+        """Run inference in FP16 when a CUDA GPU is available."""
+        import torch  # noqa: PLC0415
+
+        return torch.cuda.is_available()
+
     async def capture_video(
         self,
         token: str,
@@ -51,14 +142,14 @@ class VideoService:
 
         """
         informasjon = ""
-        video_stream_url = await ConfigAdapter().get_config(token, event["id"], "VIDEO_URL")
-        video_file_path = PhotosFileAdapter().get_raw_capture_folder_path()
-
-        clip_duration = await ConfigAdapter().get_config_int(
-            token, event["id"], "VIDEO_CLIP_DURATION"
+        # one request for all capture settings
+        configs = await ConfigAdapter().get_configs(
+            token, event["id"], ["VIDEO_URL", "VIDEO_CLIP_DURATION"]
         )
-        # Open the video stream
-        video_capture = cv2.VideoCapture(video_stream_url)
+        video_stream_url = configs["VIDEO_URL"]
+        clip_duration = int(configs["VIDEO_CLIP_DURATION"])
+        video_file_path = PhotosFileAdapter().get_raw_capture_folder_path()
+        video_capture = self.open_video_capture(video_stream_url)
         if not video_capture.isOpened():
             informasjon = f"Error opening video stream from: {video_stream_url}"
             logging.exception(informasjon)
@@ -93,6 +184,7 @@ class VideoService:
             "frame_rate": frame_rate,
             "image_size": image_size,
             "frames_per_clip": frames_per_clip,
+            "clip_duration": clip_duration,
         }
 
         try:
@@ -130,7 +222,7 @@ class VideoService:
         video_settings: dict,
         service_info: dict,
     ) -> tuple:
-        """Capture a video clip from the video stream.
+        """Capture video clips from the video stream until the service instance is stopped.
 
         Args:
             token: To update databes
@@ -143,105 +235,244 @@ class VideoService:
             tuple: A tuple containing number of clips captured and errors encountered.
 
         """
-        clip_frames = []
         clip_count = 0
         error_count = 0
-        max_errors = 10
-        consecutive_error_count = 0
-        max_consecutive_errors = 10
-        background_tasks = []  # Keep track of background write tasks
-
-        while True:
-            t_start = EventsAdapter().get_local_datetime_now(event).strftime("%Y%m%d_%H%M%S")
-
-            for _ in range(video_settings["frames_per_clip"]):
-                ret, frame = video_capture.read()
-                if ret:
-                    clip_frames.append(frame)
-                    consecutive_error_count = 0
-                else:
-                    consecutive_error_count += 1
-                if consecutive_error_count >= max_consecutive_errors:
-                    logging.error("Maximum consecutive error count reached: %d", consecutive_error_count)
-                    error_count += 1
-                    break
-
-            t_stop = EventsAdapter().get_local_datetime_now(event).strftime("%Y%m%d_%H%M%S")
-
-            if clip_frames:
-                # Save the clip to a file
-                base = Path(video_settings["video_file_path"])
-                tmp_path = base / f"TMP_CAPTURED_{t_start}_{clip_count}.mp4"
-                final_path = base / f"CAPTURED_{t_start}_{clip_count}.mp4"
-
-                # Deep copy frames to avoid mutations
-                frames_copy = [frame.copy() for frame in clip_frames]
-
-                # Spin off write task without waiting
-                task = asyncio.create_task(
-                    self.write_frames_async(frames_copy, video_settings, tmp_path, final_path)
-                )
-                background_tasks.append(task)
-
-                # Clear clip_frames for next iteration
-                clip_frames_count = len(clip_frames)
-                clip_frames = []
-                clip_count += 1
-
-                capture_timing = {
-                    "t_start": t_start,
-                    "t_stop": t_stop,
-                    "t_finalize": EventsAdapter().get_local_datetime_now(event).strftime("%Y%m%d_%H%M%S"),
-                }
-                logging.info("Captured clip %d with %d frames and timing: %s", clip_count, clip_frames_count, capture_timing)
-
-            instance_info = await ServiceInstanceAdapter().get_service_instance_by_id(token, service_info["id"])
-
-            if instance_info["action"] == "stop":
-                break  # No more frames to process
-            if error_count >= max_errors:
-                logging.error("Maximum error count reached: %d", error_count)
-                break
+        stop = threading.Event()
+        # finished clips are handed over from the reader thread, None marks the end
+        clips: asyncio.Queue[dict | None] = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+
+        def hand_over(clip: dict | None) -> None:
+            """Pass a finished clip from the reader thread to the event loop."""
+            loop.call_soon_threadsafe(clips.put_nowait, clip)
+
+        # the reader runs without pause across clip boundaries - the action is checked alongside it
+        reader = asyncio.ensure_future(
+            asyncio.to_thread(self.read_clips, video_capture, video_settings, event, hand_over, stop)
+        )
+        watcher = asyncio.create_task(
+            self.watch_stop_action(token, service_info, stop, video_settings["clip_duration"])
+        )
+        # clips are moved to their final name in the background, awaited when capture stops
+        finalize_tasks: set[asyncio.Task] = set()
 
-        # Wait for all background write tasks to complete before returning
-        if background_tasks:
-            logging.info("Waiting for %d background write tasks to complete", len(background_tasks))
-            await asyncio.gather(*background_tasks, return_exceptions=True)
+        def finalize_in_background(clip: dict) -> None:
+            """Start finalizing a clip without holding up the next one."""
+            task = asyncio.create_task(self.finalize_clip_async(clip))
+            finalize_tasks.add(task)
+            task.add_done_callback(finalize_tasks.discard)
 
+        try:
+            while (clip := await clips.get()) is not None:
+                if clip["frame_count"]:
+                    clip_count += 1
+                finalize_in_background(clip)
+            error_count = await reader
+            if watcher.done():
+                watcher.result()  # raise errors from the action check
+        except asyncio.CancelledError:
+            # the reader still uses the capture - let it end the current clip before the capture is released
+            stop.set()
+            await asyncio.wait([reader])
+            while not clips.empty():
+                if (clip := clips.get_nowait()) is not None:
+                    finalize_in_background(clip)
+            raise
+        finally:
+            stop.set()
+            watcher.cancel()
+            if finalize_tasks:
+                await asyncio.gather(*finalize_tasks, return_exceptions=True)
 
         return (clip_count, error_count)
 
-    async def write_frames_async(
-        self,
-        frames: list[np.ndarray],
-        video_settings: dict,
-        tmp_path: Path,
-        final_path: Path
+    async def watch_stop_action(
+        self, token: str, service_info: dict, stop: threading.Event, interval: float
     ) -> None:
-        """Write frames to video writer asynchronously."""
-        # Define the codec and create a VideoWriter object
-        fourcc = cv2.VideoWriter.fourcc(*"mp4v")
-        writer = cv2.VideoWriter(
-            str(tmp_path),
-            fourcc,
-            video_settings["frame_rate"],
-            video_settings["image_size"]
+        """Check the service instance action every interval seconds, set stop when asked to stop."""
+        try:
+            while not stop.is_set():
+                await asyncio.sleep(interval)
+                try:
+                    instance_info = await asyncio.wait_for(
+                        ServiceInstanceAdapter().get_service_instance_by_id(token, service_info["id"]),
+                        timeout=interval,
+                    )
+                except TimeoutError:
+                    logging.warning("Checking the service instance action timed out.")
+                    continue
+                if instance_info["action"] == "stop":
+                    break  # No more frames to process
+        finally:
+            stop.set()
+
+    async def finalize_clip_async(self, clip: dict) -> None:
+        """Wait for the clip to be written, then move it to its final name - or remove it if empty."""
+        await asyncio.to_thread(clip["writer_thread"].join)
+        if not clip["frame_count"]:
+            # nothing captured - remove the empty file
+            await asyncio.to_thread(clip["tmp_path"].unlink, missing_ok=True)
+            return
+        try:
+            await asyncio.to_thread(self.finalize_clip, clip["tmp_path"], clip["final_path"])
+            logging.info("Saved video clip to %s", clip["final_path"])
+        except Exception:
+            logging.exception("Failed to rename %s to %s", clip["tmp_path"], clip["final_path"])
+        capture_timing = {
+            "t_start": clip["t_start"],
+            "t_stop": clip["t_stop"],
+            "t_finalize": EventsAdapter().get_local_datetime_now(clip["event"]).strftime("%Y%m%d_%H%M%S"),
+        }
+        logging.info("Captured clip %d with %d frames and timing: %s", clip["number"], clip["frame_count"], capture_timing)
+
+    def finalize_clip(self, tmp_path: Path, final_path: Path) -> None:
+        """Move a finished clip to its final name - atomically, so readers never see a partial file."""
+        if tmp_path.parent != final_path.parent:
+            # copy from the staging folder first, rename is only atomic within a file system
+            tmp_path = Path(shutil.move(tmp_path, final_path.parent / tmp_path.name))
+        tmp_path.replace(final_path)
+
+    def open_video_capture(self, url: str) -> cv2.VideoCapture:
+        """Open a video stream or file - hardware decoded (NVDEC/VA-API) if available."""
+        video_capture = cv2.VideoCapture(
+            url,
+            cv2.CAP_FFMPEG,
+            [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
         )
-        if not writer.isOpened():
+        if not video_capture.isOpened():
+            # fall back to default backend
+            video_capture.release()
+            video_capture = cv2.VideoCapture(url)
+        return video_capture
+
+    def open_video_writer(self, path: Path, video_settings: dict) -> cv2.VideoWriter:
+        """Open a video writer - H.264 (hardware encoded if available), else mp4v."""
+        # the first codec that works is remembered for the following clips
+        codecs = [VideoService._writer_codec] if VideoService._writer_codec else WRITER_CODECS
+        for codec in codecs:
+            writer = cv2.VideoWriter(
+                str(path),
+                cv2.CAP_FFMPEG,
+                cv2.VideoWriter.fourcc(*codec),
+                video_settings["frame_rate"],
+                video_settings["image_size"],
+                [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+            )
+            if writer.isOpened():
+                VideoService._writer_codec = codec
+                return writer
             writer.release()
-            informasjon = f"VideoWriter failed to open: {tmp_path}"
-            raise RuntimeError(informasjon)
+        informasjon = f"VideoWriter failed to open: {path}"
+        raise RuntimeError(informasjon)
 
+    def read_clips(
+        self,
+        video_capture: cv2.VideoCapture,
+        video_settings: dict,
+        event: dict,
+        hand_over: Callable[[dict | None], None],
+        stop: threading.Event,
+    ) -> int:
+        """Read the video stream without pause and write it as clips of frames_per_clip frames.
+
+        Each clip is encoded by its own writer thread, so the next clip is read
+        while the previous one is still being written. Finished clips are handed
+        over, followed by None when reading ends.
+
+        Returns:
+            int: Number of errors encountered.
+
+        """
+        max_errors = 10
+        max_consecutive_errors = 10
+        error_count = 0
+        clip_number = 0
+        base = Path(video_settings["video_file_path"])
         try:
-            for frame in frames:
-                writer.write(frame)
+            while not stop.is_set():
+                staging = self.get_staging_folder(base, video_settings)
+                t_start = EventsAdapter().get_local_datetime_now(event).strftime("%Y%m%d_%H%M%S")
+                tmp_path = staging / f"TMP_CAPTURED_{t_start}_{clip_number}.mp4"
+                frames, writer_thread = self.start_clip_writer(tmp_path, video_settings)
+                frame_count = 0
+                consecutive_error_count = 0
+                try:
+                    while frame_count < video_settings["frames_per_clip"] and not stop.is_set():
+                        ret, frame = video_capture.read()
+                        if ret:
+                            frames.put(frame)
+                            frame_count += 1
+                            consecutive_error_count = 0
+                        else:
+                            consecutive_error_count += 1
+                        if consecutive_error_count >= max_consecutive_errors:
+                            logging.error("Maximum consecutive error count reached: %d", consecutive_error_count)
+                            error_count += 1
+                            break
+                finally:
+                    # end of clip - the writer thread releases the writer
+                    frames.put(None)
+                    hand_over({
+                        "number": clip_number,
+                        "event": event,
+                        "tmp_path": tmp_path,
+                        "final_path": base / f"CAPTURED_{t_start}_{clip_number}.mp4",
+                        "writer_thread": writer_thread,
+                        "frame_count": frame_count,
+                        "t_start": t_start,
+                        "t_stop": EventsAdapter().get_local_datetime_now(event).strftime("%Y%m%d_%H%M%S"),
+                    })
+                clip_number += 1
+                if error_count >= max_errors:
+                    logging.error("Maximum error count reached: %d", error_count)
+                    break
         finally:
-            writer.release()
+            hand_over(None)
+        return error_count
+
+    def get_staging_folder(self, base: Path, video_settings: dict) -> Path:
+        """Return the staging folder for the next clip, or base if staging has no room for it."""
+        if not CAPTURE_STAGING_PATH:
+            return base
+        width, height = video_settings["image_size"]
+        clip_size = width * height * 3 * video_settings["frames_per_clip"] // CLIP_COMPRESSION_RATIO
         try:
-            await asyncio.to_thread(tmp_path.replace, final_path)
-        except Exception:
-            logging.exception("Failed to rename %s to %s", tmp_path, final_path)
-        logging.info("Saved video clip to %s", final_path)
+            free_space = shutil.disk_usage(CAPTURE_STAGING_PATH).free
+        except OSError:
+            logging.exception("Unable to read free space in %s", CAPTURE_STAGING_PATH)
+            return base
+        if free_space < clip_size:
+            logging.warning(
+                "Not enough room in %s (%d bytes free, %d needed), writing clip to %s",
+                CAPTURE_STAGING_PATH, free_space, clip_size, base,
+            )
+            return base
+        return Path(CAPTURE_STAGING_PATH)
+
+    def start_clip_writer(
+        self, tmp_path: Path, video_settings: dict
+    ) -> tuple[queue.Queue[np.ndarray | None], threading.Thread]:
+        """Open a clip writer, fed by the returned queue until the end marker (None)."""
+        writer = self.open_video_writer(tmp_path, video_settings)
+        # bounded queue - the reader waits if encoding falls behind
+        frames: queue.Queue[np.ndarray | None] = queue.Queue(
+            maxsize=max(1, WRITE_QUEUE_SECONDS * video_settings["frame_rate"])
+        )
+
+        def writer_loop() -> None:
+            """Encode frames from the queue until the end marker (None)."""
+            try:
+                while (frame := frames.get()) is not None:
+                    try:
+                        writer.write(frame)
+                    except Exception:
+                        logging.exception("Failed to write frame to %s", tmp_path)
+            finally:
+                writer.release()
+
+        writer_thread = threading.Thread(target=writer_loop, daemon=True)
+        writer_thread.start()
+        return frames, writer_thread
 
     async def detect_crossings_local_storage(
         self,
@@ -270,7 +501,10 @@ class VideoService:
             for video_stream_url in video_urls:
                 try:
                     video_settings["url"] = video_stream_url["url"]
-                    url_list = self.detect_crossings_with_ultralytics(event, video_settings)
+                    # tracking is cpu/gpu bound - run it off the event loop
+                    url_list = await asyncio.to_thread(
+                        self.detect_crossings_with_ultralytics, event, video_settings
+                    )
                     if url_list:
                         await ConfigAdapter().update_config(
                             token, event["id"], "LATEST_DETECTED_PHOTO_URL", url_list[0]
@@ -319,13 +553,14 @@ class VideoService:
 
         """
         video_count = 0
+        # settings are read once per run, as for local storage
+        video_settings = await self.get_video_settings(token, event)
         while True:
             # Open the video stream for captured video clips
             video_url = PhotosFileAdapter().get_unlocked_capture_file(event["id"])
 
             if video_url:
                 video_count += 1
-                video_settings = await self.get_video_settings(token, event)
                 video_settings["url"] = video_url["url"]
                 # lock video file - only on cloud storage mode
                 instance_id = f"instance-{os.getpid()}"
@@ -335,7 +570,10 @@ class VideoService:
                     continue  # Skip processing this file
 
                 try:
-                    url_list = self.detect_crossings_with_ultralytics(event, video_settings)
+                    # tracking is cpu/gpu bound - run it off the event loop
+                    url_list = await asyncio.to_thread(
+                        self.detect_crossings_with_ultralytics, event, video_settings
+                    )
                     if url_list:
                         await ConfigAdapter().update_config(
                             token, event["id"], "LATEST_DETECTED_PHOTO_URL", url_list[0]
@@ -386,38 +624,89 @@ class VideoService:
             VideoStreamNotFoundError: If the video stream cannot be found.
 
         """
-        crossings = {"100": [], "90": {}, "80": {}}
-
-        # Load an official or custom model
-        model = YOLO(video_settings["yolo_model_name"])  # Load an official Detect model
+        crossings = {"100": set(), "90": {}, "80": {}}
 
+        model = self.get_detection_model(video_settings)
 
-        # Perform tracking with the model
-        try:
-            results = model.track(
-                source=video_settings["url"],
-                conf=video_settings["min_confidence"],
-                classes=DETECTION_CLASSES,
-                stream=True,
-                show=video_settings.get("show", False),
-                imgsz=video_settings["image_size"],
-                persist=True
-            )
-        except Exception as e:
+        video_capture = self.open_video_capture(video_settings["url"])
+        if not video_capture.isOpened():
             informasjon = f"Error opening video stream from: {video_settings['url']}"
-            logging.exception(informasjon)
-            raise VideoStreamNotFoundError(informasjon) from e
+            logging.error(informasjon)
+            raise VideoStreamNotFoundError(informasjon)
 
+        # Perform tracking with the model - decode a batch of frames and run
+        # inference on the whole batch, the tracker is kept between batches
         url_list = []
-        for frame_number, result in enumerate(results, start=1):
-            detections = VisionAIService().process_boxes(
-                event["id"], result, video_settings, crossings, frame_number
-            )
-            if detections:
-                url_list.extend(detections)
+        vision_ai_service = VisionAIService()
+        frame_stride = max(1, video_settings.get("frame_stride", 1))
+        try:
+            for frames, frame_numbers in self.read_batches(video_capture, frame_stride):
+                results = model.track(
+                    source=frames,
+                    conf=video_settings["min_confidence"],
+                    classes=DETECTION_CLASSES,
+                    show=video_settings.get("show", False),
+                    imgsz=video_settings["image_size"],
+                    half=self.use_half_precision(),
+                    persist=True,
+                    verbose=False,
+                )
+                for frame_number, result in zip(frame_numbers, results, strict=True):
+                    # timestamps are derived from the video file name
+                    result.path = video_settings["url"]
+                    detections = vision_ai_service.process_boxes(
+                        event["id"], result, video_settings, crossings, frame_number
+                    )
+                    if detections:
+                        url_list.extend(detections)
+        finally:
+            video_capture.release()
 
         return url_list
 
+    def get_detection_model(self, video_settings: dict) -> YOLO:
+        """Get the detection model, ready for a new video."""
+        # Load an official or custom model - as TensorRT engine if enabled and on GPU
+        model_name = video_settings["yolo_model_name"]
+        if video_settings.get("tensorrt") and self.use_half_precision():
+            model_name = self.get_tensorrt_engine(model_name, video_settings["image_size"])
+        model = self.get_yolo_model(model_name)
+        # the model is reused across videos - start each video with fresh tracks
+        for tracker in getattr(model.predictor, "trackers", []):
+            tracker.reset()
+        return model
+
+    def read_batches(
+        self, video_capture: cv2.VideoCapture, stride: int
+    ) -> Iterator[tuple[list[np.ndarray], list[int]]]:
+        """Decode a video in batches of frames, keeping every stride-th frame.
+
+        Yields:
+            tuple: The frames, and their frame numbers in the video.
+
+        """
+        frames = []
+        frame_numbers = []
+        frame_index = 0  # position in the video, skipped frames included
+        while True:
+            ret, frame = video_capture.read()
+            if not ret:
+                break
+            frame_index += 1
+            frames.append(frame)
+            frame_numbers.append(frame_index)
+            # skip frames without decoding them
+            for _ in range(stride - 1):
+                if not video_capture.grab():
+                    break
+                frame_index += 1
+            if len(frames) == DETECTION_BATCH_SIZE:
+                yield frames, frame_numbers
+                frames = []
+                frame_numbers = []
+        if frames:
+            yield frames, frame_numbers
+
     async def get_video_settings(
         self,
         token: str,
@@ -433,26 +722,31 @@ class VideoService:
             A dict with video settings.
 
         """
-        video_settings = {}
-        video_settings["camera_location"] = await ConfigAdapter().get_config(
-            token, event["id"], "CAMERA_LOCATION"
+        keys = [
+            "CAMERA_LOCATION",
+            "YOLO_MODEL_NAME",
+            "DETECT_ANALYTICS_IMAGE_SIZE",
+            "DETECTION_CONFIDENCE_THRESHOLD",
+            "DETECT_ANALYTICS_SHOW_VIDEO",
+            "DETECT_FRAME_STRIDE",
+            "DETECT_TENSORRT",
+        ]
+        configs, trigger_line = await asyncio.gather(
+            ConfigAdapter().get_configs(token, event["id"], keys),
+            VisionAIService().get_trigger_line_xyxy_list(token, event),
         )
-
-        video_settings["yolo_model_name"] = await ConfigAdapter().get_config(
-            token, event["id"], "YOLO_MODEL_NAME"
-        )
-        video_settings["image_size"] = await ConfigAdapter().get_config_img_res_tuple(
-            token, event["id"], "DETECT_ANALYTICS_IMAGE_SIZE"
-        )
-        video_settings["trigger_line"] = (
-            await VisionAIService().get_trigger_line_xyxy_list(
-                token, event
-            )
+        video_settings = {}
+        video_settings["camera_location"] = configs["CAMERA_LOCATION"]
+        video_settings["yolo_model_name"] = configs["YOLO_MODEL_NAME"]
+        video_settings["image_size"] = ConfigAdapter.to_img_res_tuple(
+            "DETECT_ANALYTICS_IMAGE_SIZE", configs["DETECT_ANALYTICS_IMAGE_SIZE"]
         )
-        video_settings["min_confidence"] = float(await ConfigAdapter().get_config(
-            token, event["id"], "DETECTION_CONFIDENCE_THRESHOLD"
-        ))
-        video_settings["show"] = await ConfigAdapter().get_config_bool(
-            token, event["id"], "DETECT_ANALYTICS_SHOW_VIDEO"
+        # line constants are computed once per run, not per detection
+        video_settings["trigger_line"] = TriggerLine.from_xyxy(trigger_line)
+        video_settings["min_confidence"] = float(configs["DETECTION_CONFIDENCE_THRESHOLD"])
+        video_settings["show"] = ConfigAdapter.to_bool(
+            configs["DETECT_ANALYTICS_SHOW_VIDEO"]
         )
+        video_settings["frame_stride"] = int(configs["DETECT_FRAME_STRIDE"])
+        video_settings["tensorrt"] = ConfigAdapter.to_bool(configs["DETECT_TENSORRT"])
         return video_settings
@@ -1,13 +1,16 @@
 """Module for status adapter."""
 
+from __future__ import annotations
+
+import asyncio
 import datetime
 import logging
 import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 import cv2
 import numpy as np
-from torch import Tensor
-from ultralytics.engine.results import Results
 
 from video_service.adapters import (
     ConfigAdapter,
@@ -18,16 +21,44 @@ from video_service.adapters.google_cloud_storage_adapter import (
     GoogleCloudStorageAdapter,
 )
 
+if TYPE_CHECKING:
+    from ultralytics.engine.results import Results
+
 COUNT_COORDINATES = 4
 DETECTION_BOX_MINIMUM_SIZE = 0.01
 DETECTION_BOX_MAXIMUM_SIZE = 0.9
 EDGE_MARGIN = 0.02
 
 
+@dataclass(frozen=True, slots=True)
+class TriggerLine:
+    """Trigger line with line constants precomputed, y = a * x + b."""
+
+    x1: float
+    x2: float
+    a: float
+    b_100: float
+    b_90: float
+    b_80: float
+
+    @classmethod
+    def from_xyxy(cls, xyxy: list) -> TriggerLine:
+        """Create from trigger line coordinates [x1, y1, x2, y2]."""
+        x1, y1, x2, y2 = xyxy
+        # crossings are found from the line slope - x1 and x2 cannot be equal
+        if x1 == x2:
+            informasjon = "TRIGGER_LINE_XYXYN must have different x1 and x2, a vertical line is not supported."
+            logging.error(informasjon)
+            raise Exception(informasjon)
+        # get line derivated
+        a = (y2 - y1) / (x2 - x1)
+        return cls(x1, x2, a, y1 - a * x1, (y1 * 0.9) - a * x1, (y1 * 0.8) - a * x1)
+
+
 class VisionAIService:
     """Class representing vision ai services."""
 
-    def get_crop_image(self, im: np.ndarray, xyxy: Tensor) -> np.ndarray:
+    def get_crop_image(self, im: np.ndarray, xyxy: np.ndarray) -> np.ndarray:
         """Get cropped image."""
         x1, y1, x2, y2 = map(int, xyxy.tolist())  # Ensure integer coordinates
         return im[y1:y2, x1:x2]  # Cropping in OpenCV (NumPy array slicing)
@@ -129,101 +160,101 @@ class VisionAIService:
         """Process result from video analytics."""
         detect_url_list = []
         boxes = result.boxes
-        if boxes:
-            class_values = boxes.cls
+        # no track ids - nothing to follow across frames
+        if boxes and boxes.id is not None:
+            # classify all boxes in the frame at once - a single device to host
+            # transfer, rows are x1, y1, x2, y2, track id, confidence, class
+            box_data = boxes.data.cpu().numpy().astype(np.float64)
+            xyxy_all = box_data[:, :4]
+            ids = box_data[:, 4].astype(np.int64)
+            height, width = boxes.orig_shape[:2]
+            xyxyn_all = xyxy_all / np.array([width, height, width, height])
+            crossed_lines = self.is_below_line(xyxyn_all, video_settings["trigger_line"])
+            # ignore small boxes
+            box_confidences = self.validate_box(xyxyn_all)
+            candidates = np.flatnonzero(
+                (crossed_lines != "false") & (box_confidences > video_settings["min_confidence"])
+            )
 
-            for y in range(len(class_values)):
+            for y in candidates:
                 try:
 
-                    d_id = int(boxes.id[y].item())  # type: ignore[attr-defined]
-                    xyxyn = boxes.xyxyn[y]
-                    crossed_line = self.is_below_line(
-                        xyxyn, video_settings["trigger_line"]
-                    )
-                    # ignore small boxes
-                    box_confidence = self.validate_box(xyxyn)
-                    if (crossed_line != "false") and box_confidence > video_settings["min_confidence"]:
-                        # Extract screenshot image from the results
-                        xyxy = boxes.xyxy[y]
-                        if crossed_line != "100":
-                            if d_id not in crossings[crossed_line]:
-                                crossings[crossed_line][d_id] = (
-                                    VisionAIService().get_crop_image(result.orig_img, xyxy)
-                                )
-                        elif d_id not in crossings[crossed_line]:
-                            crossings[crossed_line].append(d_id)
-                            metadata = VisionAIService().create_image_info(
-                                event_id,
-                                video_settings,
-                                box_confidence,
-                                frame_number,
-                                result.path,
-                                d_id
+                    d_id = int(ids[y])
+                    crossed_line = str(crossed_lines[y])
+                    box_confidence = float(box_confidences[y])
+                    # Extract screenshot image from the results
+                    xyxy = xyxy_all[y]
+                    if crossed_line != "100":
+                        if d_id not in crossings[crossed_line]:
+                            crossings[crossed_line][d_id] = (
+                                self.get_crop_image(result.orig_img, xyxy)
                             )
-                            url = VisionAIService().save_detect_image(
-                                result,
-                                crossings,
-                                xyxy,
-                                metadata,
-                            )
-                            detect_url_list.append(url)
+                    elif d_id not in crossings[crossed_line]:
+                        crossings[crossed_line].add(d_id)
+                        metadata = self.create_image_info(
+                            event_id,
+                            video_settings,
+                            box_confidence,
+                            frame_number,
+                            result.path,
+                            d_id
+                        )
+                        url = self.save_detect_image(
+                            result,
+                            crossings,
+                            xyxy,
+                            metadata,
+                        )
+                        detect_url_list.append(url)
 
                 except TypeError as e:
                     logging.debug(f"TypeError: {e}")
         return detect_url_list
 
-    def validate_box(self, xyxyn: Tensor) -> float:
-        """Return probability of valid box from 1 to 0."""
-        box_validation = 1.0
-        box_with = xyxyn.tolist()[2] - xyxyn.tolist()[0]
-        box_heigth = xyxyn.tolist()[3] - xyxyn.tolist()[1]
+    def validate_box(self, xyxyn: np.ndarray) -> np.ndarray:
+        """Return probability of valid box from 1 to 0, for all boxes (n x 4)."""
+        x1, y1, x2, y2 = xyxyn.T
+        box_with = x2 - x1
+        box_heigth = y2 - y1
+
+        # check if box is at the edge
+        at_edge = (
+            (x1 < EDGE_MARGIN) | (y1 < EDGE_MARGIN)
+            | (x2 > (1 - EDGE_MARGIN)) | (y2 > (1 - EDGE_MARGIN))
+        )
+        box_validation = np.where(at_edge, 0.75, 1.0)
 
         # check if box is too small or too big
-        if (box_with < DETECTION_BOX_MINIMUM_SIZE) or (box_heigth < DETECTION_BOX_MINIMUM_SIZE):
-            return 0.0
-        if (box_with > DETECTION_BOX_MAXIMUM_SIZE) or (box_heigth > DETECTION_BOX_MAXIMUM_SIZE):
-            return 0.0
+        invalid_size = (
+            (box_with < DETECTION_BOX_MINIMUM_SIZE) | (box_heigth < DETECTION_BOX_MINIMUM_SIZE)
+            | (box_with > DETECTION_BOX_MAXIMUM_SIZE) | (box_heigth > DETECTION_BOX_MAXIMUM_SIZE)
+        )
+        return np.where(invalid_size, 0.0, box_validation)
 
-        # check if box is at the edge
-        if (xyxyn.tolist()[0] < EDGE_MARGIN) or (xyxyn.tolist()[1] < EDGE_MARGIN):
-            return 0.75
-        if (xyxyn.tolist()[2] > (1 - EDGE_MARGIN)) or (xyxyn.tolist()[3] > (1 - EDGE_MARGIN)):
-            return 0.75
-
-
-        return box_validation
-
-    def is_below_line(self, xyxyn: Tensor, trigger_line: list) -> str:
-        """Check if a point is below a trigger line."""
-        x_center_pos = (xyxyn.tolist()[2] + xyxyn.tolist()[0]) / 2
-        y_lower_pos = xyxyn.tolist()[3]
-        x1 = trigger_line[0]
-        y1 = trigger_line[1]
-        x2 = trigger_line[2]
-        y2 = trigger_line[3]
-        # check if more than half of the box is outside line x values
-        if (x_center_pos < x1) or (x_center_pos > x2):
-            return "false"
-        # get line derivated
-        a = (y2 - y1) / (x2 - x1)
+    def is_below_line(self, xyxyn: np.ndarray, trigger_line: TriggerLine) -> np.ndarray:
+        """Check which boxes are below a trigger line - "100", "90", "80" or "false" per box."""
+        x_center_pos = (xyxyn[:, 2] + xyxyn[:, 0]) / 2
+        y_lower_pos = xyxyn[:, 3]
         # get line y value at point x and check if point y is below
-        y = a * (x_center_pos - x1) + y1
-        y_80 = a * (x_center_pos - x1) + (y1 * 0.8)
-        y_90 = a * (x_center_pos - x1) + (y1 * 0.9)
-        if y_lower_pos > y:
-            return "100"
-        if y_lower_pos > y_90:
-            return "90"
-        if y_lower_pos > y_80:
-            return "80"
-        return "false"
-
+        y_slope = trigger_line.a * x_center_pos
+        crossed = np.select(
+            [
+                y_lower_pos > y_slope + trigger_line.b_100,
+                y_lower_pos > y_slope + trigger_line.b_90,
+                y_lower_pos > y_slope + trigger_line.b_80,
+            ],
+            ["100", "90", "80"],
+            default="false",
+        )
+        # check if more than half of the box is outside line x values
+        outside = (x_center_pos < trigger_line.x1) | (x_center_pos > trigger_line.x2)
+        return np.where(outside, "false", crossed)
 
     def save_detect_image(
         self,
         result: Results,
         crossings: dict,
-        xyxy: Tensor,
+        xyxy: np.ndarray,
         metadata: dict
     ) -> str:
         """Save image and crop_images to file."""
@@ -246,9 +277,9 @@ class VisionAIService:
             crop_im_list.append(crossings["90"][metadata["d_id"]])
             crossings["90"].pop(metadata["d_id"])
         # add crop of saved image (100)
-        crop_im_list.append(VisionAIService().get_crop_image(result.orig_img, xyxy))
+        crop_im_list.append(self.get_crop_image(result.orig_img, xyxy))
 
-        VisionAIService().save_crop_images(
+        self.save_crop_images(
             metadata["event_id"],
             crop_im_list,
             metadata["filnavn"],
@@ -262,10 +293,10 @@ class VisionAIService:
         status_type: str,
     ) -> None:
         """Print an image with a trigger line."""
-        trigger_line_xyxyn = await self.get_trigger_line_xyxy_list(
-            token, event
+        trigger_line_xyxyn, video_stream_url = await asyncio.gather(
+            self.get_trigger_line_xyxy_list(token, event),
+            ConfigAdapter().get_config(token, event["id"], "VIDEO_URL"),
         )
-        video_stream_url = await ConfigAdapter().get_config(token, event["id"], "VIDEO_URL")
 
         cap = cv2.VideoCapture(video_stream_url)
         # check if video stream is opened
@@ -276,23 +307,21 @@ class VisionAIService:
         try:
             # Show the results
             _, im = cap.read()
-            # Convert the frame to RBG
-            im_rgb = cv2.cvtColor(im, cv2.COLOR_BGR2RGB)
 
             # Draw the trigger line
             x1, y1, x2, y2 = map(float, trigger_line_xyxyn)  # Ensure integer coordinates
             cv2.line(
-                im_rgb,
+                im,
                 (int(x1 * im.shape[1]), int(y1 * im.shape[0])),
                 (int(x2 * im.shape[1]), int(y2 * im.shape[0])),
-                (255, 0, 0),  # Color (BGR)
+                (0, 0, 255),  # Color (BGR) - red
                 5
             )  # Thickness
 
             # Draw the grid lines
             for x in range(10, 100, 10):
                 cv2.line(
-                    im_rgb,
+                    im,
                     (int(x * im.shape[1] / 100), 0),
                     (int(x * im.shape[1] / 100), im.shape[0]),
                     (255, 255, 255),
@@ -300,7 +329,7 @@ class VisionAIService:
                 )
             for y in range(10, 100, 10):
                 cv2.line(
-                    im_rgb,
+                    im,
                     (0, int(y * im.shape[0] / 100)),
                     (im.shape[1], int(y * im.shape[0] / 100)),
                     (255, 255, 255),
@@ -310,7 +339,7 @@ class VisionAIService:
             # Add text (using OpenCV)
             font_face = 1
             font_scale = 2
-            font_color = (255, 0, 0)  # red
+            font_color = (0, 0, 255)  # red (BGR)
 
             # get the current time with timezone
             current_time = datetime.datetime.now(datetime.UTC)
@@ -318,13 +347,13 @@ class VisionAIService:
             image_time_text = (
                 f"Line coordinates: {trigger_line_xyxyn}. Time: {time_text}"
             )
-            cv2.putText(im_rgb, image_time_text, (50, 50), font_face, font_scale, font_color, 2, cv2.LINE_AA)
+            cv2.putText(im, image_time_text, (50, 50), font_face, font_scale, font_color, 2, cv2.LINE_AA)
 
             # save image to file
             file_name = f"{time_text}_trigger_line.jpg"
 
             # Save the original image to Google Cloud Storage
-            success, encoded_image = cv2.imencode(".jpg", cv2.cvtColor(im_rgb, cv2.COLOR_RGB2BGR))
+            success, encoded_image = cv2.imencode(".jpg", im)  # already BGR, as read
             if not success:
                 information = "Failed to encode image for upload."
                 raise Exception(information)
@@ -338,11 +367,10 @@ class VisionAIService:
 
             informasjon = "Trigger line photo created."
             await StatusAdapter().create_status(token, event, status_type, informasjon, {"trigger_line_photo_url": url})
-            await ConfigAdapter().update_config(
-                token, event["id"], "NEW_TRIGGER_LINE_PHOTO", "False"
-            )
-            await ConfigAdapter().update_config(
-                token, event["id"], "TRIGGER_LINE_PHOTO_URL", url
+            await ConfigAdapter().update_configs(
+                token,
+                event["id"],
+                {"NEW_TRIGGER_LINE_PHOTO": "False", "TRIGGER_LINE_PHOTO_URL": url},
             )
 
         except TypeError as e: